@@ -14,7 +14,7 @@ setup(
     author_email     = 'thenonproton@pm.me',
     url              = 'https://github.com/NonProjects/steganon',
     packages         = ['steganon', 'steganon.cli'],
-    install_requires = ['pillow'],
+    install_requires = ['pillow', 'numpy'],
 
     extras_require = {
         'cli': ['click==8.1.7']
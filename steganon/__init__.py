@@ -1,12 +1,37 @@
-from . import api
-from . import tools
+from importlib import import_module
 
-from .api import LSB_WS
-from .tools import pngify
 from .version import VERSION
 
-from PIL import Image
-
 
 __version__ = VERSION
 __author__ = 'thenonproton@pm.me'
+
+__all__ = ['api', 'tools', 'LSB_WS', 'pngify', 'VERSION', 'Image']
+
+# PIL and NumPy take most of the import time, so we import
+# them on the first use only. This makes CLI commands like
+# the "info" or "--help" to start much faster. Name is
+# mapped to the (module, attribute of it or None).
+_LAZY_ATTRIBUTES = {
+    'api': ('steganon.api', None),
+    'tools': ('steganon.tools', None),
+    'LSB_WS': ('steganon.api', 'LSB_WS'),
+    'pngify': ('steganon.tools', 'pngify'),
+    'Image': ('PIL.Image', None)
+}
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    module, attribute = _LAZY_ATTRIBUTES[name]
+
+    value = import_module(module)
+    if attribute:
+        value = getattr(value, attribute)
+
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -3,6 +3,7 @@ from os import PathLike
 from typing import Callable, Optional
 
 from PIL import Image
+import numpy as np
 
 from .errors import (
     StateAlreadyCreated, SeedAlreadyUsed,
@@ -11,6 +12,120 @@ from .errors import (
 
 __all__ = ['LSB_WS']
 
+# Nine bits (MSB first) of every byte value. As byte >> 8
+# is always zero, every byte gets an additional zero at start
+_BITS9 = (
+    np.arange(256, dtype=np.uint8)[:,None]
+    >> np.arange(8, -1, -1, dtype=np.uint8)
+) & 1
+
+# TestMode colors of pixel by its bit: Red for 0, Green for 1
+_TEST_COLORS = np.array([(255,0,0), (0,255,0)], dtype=np.uint8)
+
+class _RandomPixels:
+    """
+    This class produces positions of pixels, exactly the same
+    as a pair of Random(seed).randrange(x_size) and after it
+    Random(seed).randrange(y_size) calls would do, but in bulk.
+
+    Random.randrange(n) takes n.bit_length() top bits of the
+    next 32 bit word of Mersenne Twister until they are less
+    than n. We feed NumPy's MT19937 with the state of the
+    Random(seed) and vectorize this rejection sampling.
+    """
+    def __init__(self, seed, size: tuple):
+        self._size = size
+        # Words are shifted to keep n.bit_length() top bits
+        self._shifts = (
+            32 - size[0].bit_length(),
+            32 - size[1].bit_length()
+        )
+        # randrange(n) accepts word with probability of
+        # n / 2**n.bit_length(), so this is an expected
+        # number of words that we need for one pixel
+        self._words_per_pixel = sum(
+            2**n.bit_length() / n for n in size
+        )
+
+        state = Random(seed).getstate()[1]
+        self._bitgen = np.random.MT19937()
+        self._bitgen.state = {
+            'bit_generator': 'MT19937',
+            'state': {
+                'key': np.array(state[:-1], dtype=np.uint32),
+                'pos': state[-1]
+            }
+        }
+
+        # Positions that we already drew, but not returned yet
+        self._xs = np.empty(0, dtype=np.intp)
+        self._ys = np.empty(0, dtype=np.intp)
+        self._cursor = 0
+        # X of the pixel for which we didn't draw the Y yet
+        self._pending_x = None
+
+    def __draw(self, count: int) -> None:
+        """Will draw at least count new positions to the buffer"""
+        xs = [self._xs[self._cursor:]]
+        ys = [self._ys[self._cursor:]]
+
+        while count > 0:
+            words = self._bitgen.random_raw(
+                int(count * self._words_per_pixel) + 64
+            )
+
+            x, y = words >> self._shifts[0], words >> self._shifts[1]
+            x_ok, y_ok = x < self._size[0], y < self._size[1]
+
+            # State after a word is 0 if we wait for X and 1 if
+            # we wait for Y. Word that is accepted only as X (or
+            # only as Y) sets state to 1 (or 0) regardless of the
+            # previous one, word that is accepted as both flips it
+            initial = int(self._pending_x is not None)
+
+            indices = np.arange(words.size)
+            last_set = np.maximum.accumulate(
+                np.where(x_ok != y_ok, indices, -1)
+            )
+            flips = np.cumsum(x_ok & y_ok)
+
+            has_set = last_set >= 0
+            state_after = np.where(has_set, x_ok[last_set], initial)
+            state_after ^= (flips - np.where(has_set,
+                flips[last_set], 0)) & 1
+
+            state_before = np.concatenate(([initial], state_after[:-1]))
+
+            x = x[(state_before == 0) & x_ok]
+            y = y[(state_before == 1) & y_ok]
+
+            if initial:
+                x = np.concatenate(([self._pending_x], x))
+
+            self._pending_x = x[y.size] if x.size > y.size else None
+
+            xs.append(x[:y.size])
+            ys.append(y)
+            count -= y.size
+
+        self._xs = np.concatenate(xs).astype(np.intp)
+        self._ys = np.concatenate(ys).astype(np.intp)
+        self._cursor = 0
+
+    def positions(self, count: int) -> tuple:
+        """Will return arrays of X and Y for the next count pixels"""
+        if self._xs.size - self._cursor < count:
+            self.__draw(count - (self._xs.size - self._cursor))
+
+        xs = self._xs[self._cursor:self._cursor+count]
+        ys = self._ys[self._cursor:self._cursor+count]
+        self._cursor += count
+        return xs, ys
+
+    def rewind(self, count: int) -> None:
+        """Will return last count positions back to the stream"""
+        self._cursor -= count
+
 class LSB_WS:
     """
     This class implements an LSB-With-Seed algorithm. The
@@ -54,75 +169,179 @@ class LSB_WS:
                 to see distribution with different
                 seed if you need to / interested.
         """
+        # We hide three bits in three color bands of every
+        # pixel, so images with less bands (e.g Grayscale or
+        # Palette) can not hold data. Convert them to RGB first
+        if len(image.getbands()) < 3:
+            raise ValueError(
+                f'image mode {image.mode} is not supported, '
+                 'please convert image to the RGB or RGBA')
+
         self.image = image
         self._size = self.image.size
-        self.__px = self.image.load()
-
-        self.__information_pixels_pos = []
-        self.__edited_pixels_pos = set()
+        # Every byte takes three pixels, plus nine "Information pixels"
+        self._max_allowed_bytes = (self._size[0] * self._size[1] - 9) // 3
+        # We work on a NumPy copy of pixels (X*Y, Bands), so
+        # reads and writes of LSB are done in bulk instead of
+        # per pixel PixelAccess calls. Pixel on (x,y) is the
+        # self.__pixels[y * x_size + x]. See __update_image
+        self.__pixels = np.array(self.image).reshape(
+            self._size[0] * self._size[1], -1
+        )
+        # Same pixels, but every pixel is a one opaque item,
+        # so we can scatter whole pixels instead of bands
+        self.__pixels_void = self.__pixels.view(
+            np.dtype((np.void, self.__pixels.shape[1]))
+        ).ravel()
+
+        self.__information_pixels_pos = None
+        self.__edited_pixels_pos = np.zeros(
+            self._size[0] * self._size[1], dtype=np.bool_
+        )
         self.__mode = 0
 
         self.__testmode = testmode
 
         self.__seed = seed
 
-        self._random = Random(self.__seed)
+        self._random = _RandomPixels(self.__seed, self._size)
         self._progress_callback = progress_callback
 
-    def __get_free_pixel_position(self) -> tuple:
-        """Will return coordinates of unused pixel"""
-        while True:
-            x = self._random.randrange(self._size[0])
-            y = self._random.randrange(self._size[1])
-
-            if (x,y) in self.__edited_pixels_pos:
-                continue
-            else:
-                self.__edited_pixels_pos.add((x,y))
-                return (x,y)
-
-    def __extract_bits_from_pixel(self, pixel: tuple) -> str:
-        """Will extract three hidden bits from the pixel"""
-        pixel = (pixel,) if isinstance(pixel, int) else pixel
-        return ''.join((bin(i)[-1] for i in pixel[:3]))
-
-    def __coordinates_to_bytes(self, coordinates: list) -> bytes:
-        """Will convert a bunch of coordinates to bytes"""
-        bits = ''.join([
-            self.__extract_bits_from_pixel(self.__px[i[0], i[1]])
-            for i in coordinates
-        ])
-        try:
-            bytes_, pos = [], 0
-            for i in range(len(bits)//9):
-                bytes_.append(int(bits[pos:pos+9],2))
-                pos += 9
+    def __get_free_pixels_positions(self, count: int) -> np.ndarray:
+        """Will return positions of count unused pixels"""
+        edited, random_ = self.__edited_pixels_pos, self._random
+        x_size = self._size[0]
+
+        positions, total = np.empty(count, dtype=np.intp), 0
+
+        while total < count:
+            # The more pixels are edited the more random positions
+            # we skip, so we request them in advance by this ratio
+            pixels_free = edited.size - np.count_nonzero(edited)
+
+            requested = (count - total) * edited.size
+            requested = requested // max(pixels_free, 1) + 64
+
+            xs, ys = random_.positions(requested)
+            candidates = ys * x_size + xs
+
+            # We skip already edited pixels and repeats of the
+            # pixel within candidates, only first one is free
+            _, first = np.unique(candidates, return_index=True)
+            free = np.zeros(candidates.size, dtype=np.bool_)
+            free[first] = True
+            free &= ~edited[candidates]
+
+            # We could get more free pixels than we need. In
+            # this case return the rest of positions back
+            found = np.cumsum(free)
+            if found[-1] > count - total:
+                last = np.searchsorted(found, count - total)
+                random_.rewind(candidates.size - last - 1)
+                free = free[:last+1]
+                candidates = candidates[:last+1]
+
+            candidates = candidates[free]
+            edited[candidates] = True
+
+            positions[total:total+candidates.size] = candidates
+            total += candidates.size
+
+        return positions
+
+    def __update_image(self) -> None:
+        """Will write changed pixels back to the self.image"""
+        if self.image.readonly:
+            # Image shares memory with another object (e.g it's
+            # made by Image.fromarray or is a memory mapped file),
+            # so we paste, which makes image to own its pixels
+            self.image.paste(Image.frombytes(
+                self.image.mode, self._size, self.__pixels
+            ))
+        else:
+            self.image.frombytes(self.__pixels)
 
-        except ValueError as e:
+    def __write_bytes(self, positions: np.ndarray, information: np.ndarray) -> None:
+        """Will hide bytes of information in a bunch of pixels"""
+
+        # Nine bits of every byte, so there is
+        # a three bits (one per color) per pixel
+        bits = _BITS9.take(information, axis=0)
+
+        # Pixels are picked randomly, so we gather and scatter
+        # them whole. This is faster than index every band
+        pixels = self.__pixels.take(positions, axis=0)
+        colors = pixels[:,:3]
+
+        if self.__testmode:
+            # Red if next bit of data is 0, Green if it's 1
+            colors[:] = _TEST_COLORS.take(bits[:,:3].ravel(), axis=0)
+        else:
+            colors &= 0xFE
+            colors |= bits.reshape(-1, 3)
+
+        self.__pixels_void[positions] = pixels.view(
+            self.__pixels_void.dtype).ravel()
+
+    def __positions_to_bytes(self, positions: np.ndarray) -> bytes:
+        """Will convert a bunch of pixels positions to bytes"""
+        bits = (self.__pixels.take(positions, axis=0)[:,:3] & 1).ravel()
+        bits = bits[:bits.size // 9 * 9].reshape(-1, 9)
+
+        # Each byte is hidden as a nine bits where first is
+        # always zero, so if it's not, we can not decode it
+        if bits[:,0].any():
             raise IncorrectDecode(
                 'Can not decode bytes. Maybe image was incorrectly '
                 'compressed on saving? Use bigger W:H if you want '
-                'to store big data.') from e
+                'to store big data.')
+
+        return np.packbits(bits[:,1:], axis=1).tobytes()
+
+    def __get_information_pixels_pos(self) -> np.ndarray:
+        """
+        Will return positions of the "Information pixels". This
+        is a first nine pixels, in them we store a total size
+        of hidden data (three bytes, so up to 256^3-1 bytes).
+        """
+        if self.__information_pixels_pos is None:
+            self.__information_pixels_pos = \
+                self.__get_free_pixels_positions(9)
 
-        return bytes(bytes_)
+        return self.__information_pixels_pos
+
+    def __set_information_size(self, size: int) -> None:
+        """Will write a total length of hidden in image data"""
+        self.__write_bytes(
+            self.__get_information_pixels_pos(),
+            np.array([(size >> 16) & 0xFF, (size >> 8) & 0xFF,
+                size & 0xFF], dtype=np.uint8)
+        )
 
     def __get_information_size(self) -> int:
         """Will return a total length of hidden in image text"""
-        if not self.__information_pixels_pos:
-            self.__information_pixels_pos = [
-                self.__get_free_pixel_position() for _ in range(9)
-            ]
         try:
-            information_bytes = self.__coordinates_to_bytes(
-                self.__information_pixels_pos
+            information_bytes = self.__positions_to_bytes(
+                self.__get_information_pixels_pos()
             )
-        except ValueError:
+        except IncorrectDecode:
             raise InvalidSeed(InvalidSeed.__doc__) from None
 
-        if not information_bytes:
-            return 0
-        else:
-            return int.from_bytes(information_bytes,'big')
+        information_size = (information_bytes[0] << 16)\
+            | (information_bytes[1] << 8) | information_bytes[2]
+        # Size from the wrong seed can be bigger than image
+        if information_size > self._max_allowed_bytes:
+            raise InvalidSeed(InvalidSeed.__doc__)
+
+        return information_size
+
+    @property
+    def max_allowed_bytes(self) -> int:
+        """
+        Will return a maximum of bytes you can hide in image. Every
+        byte takes three pixels, plus nine "Information pixels".
+        """
+        return self._max_allowed_bytes
 
     @property
     def seed(self):
@@ -134,7 +353,7 @@ class LSB_WS:
         if self.__mode:
             raise SeedAlreadyUsed('Old seed already in use, can not change')
         self.__seed = seed
-        self._random = Random(self.__seed)
+        self._random = _RandomPixels(self.__seed, self._size)
 
     def hide(self, information: bytes) -> int:
         """
@@ -145,7 +364,7 @@ class LSB_WS:
                 An information you want to hide. Will
                 be added to the old one.
 
-                You can hide up to (x_size * y_size) // 3
+                You can hide up to (x_size * y_size - 9) // 3
                 bytes of data. Use bigger images.
 
         Returns:
@@ -159,7 +378,12 @@ class LSB_WS:
         if not information:
             raise ValueError('information can not be empty')
 
-        information = list(information)
+        # We don't make a list of int objects from information,
+        # bytes are used as is. Blocks of it are just views
+        try:
+            information = np.frombuffer(information, dtype=np.uint8)
+        except TypeError: # Not bytes-like, e.g list of ints
+            information = np.array(list(information), dtype=np.uint8)
 
         if not self.__mode:
             info_size = len(information)
@@ -167,89 +391,36 @@ class LSB_WS:
         else:
             info_size = self.__get_information_size() + len(information)
 
-        max_allowed_bytes = (self._size[0] * self._size[1]) // 3
-
-        if info_size > max_allowed_bytes:
+        if info_size > self._max_allowed_bytes:
             raise OverflowError(
                 '''Can not add more info. Maximum for your '''
-               f'''image is a {max_allowed_bytes}, used '''
+               f'''image is a {self._max_allowed_bytes}, used '''
                f'''{info_size - len(information)} bytes, you '''
                f'''want to write {info_size}.'''
             )
         elif info_size > 256**3-1:
             raise OverflowError('Can not add more info, max is 256^3-1 bytes')
 
-        info_size_bytes = list(int.to_bytes(info_size, 3, 'big'))
-        information = [*info_size_bytes, *information]
-        info_pixels_pos_copy = self.__information_pixels_pos.copy()
+        # We rewrite total size of hidden data on every hide()
+        self.__set_information_size(info_size)
 
         information_length = len(information)
+        # We report only progress by 5% because
+        # calling progress_callback can be slow
+        step = max(information_length // 20, 1)
+
+        for indx in range(0, information_length, step):
+            # Should be bit per pixel color (RGB), so 8 bits per byte
+            # isn't enough :D. We add additional zero at binary start,
+            # thus every byte of information will take three pixels
+            block = information[indx:indx+step]
+            positions = self.__get_free_pixels_positions(len(block) * 3)
+            self.__write_bytes(positions, block)
 
-        for indx, byte in enumerate(information):
             if self._progress_callback:
-                percent = round((indx+1) / information_length * 100)
-                # We report only progress by 5% because
-                # calling progress_callback can be slow
-                if percent and not percent % 5:
-                    self._progress_callback(indx+1, information_length)
+                self._progress_callback(indx+len(block), information_length)
 
-            # Should be bit per pixel color (RGB), so 8 bits per byte
-            # isn't enough :D. We add additional zero at binary start
-            current_bits = list(f'0{bin(byte)[2:].zfill(8)}')
-            # Will take current_bits[current_bits_pos] later on code
-            current_bits_pos = 0
-
-            for _ in range(len(current_bits) // 3):
-                # current_bit is a current_bit of data to hide
-                while True:
-                    if info_pixels_pos_copy:
-                        x,y = info_pixels_pos_copy.pop(0)
-                    else:
-                        x = self._random.randrange(self._size[0])
-                        y = self._random.randrange(self._size[1])
-
-                    if len(self.__information_pixels_pos) < 9\
-                        and (x,y) in self.__information_pixels_pos:
-                            continue
-
-                    if (x,y) in self.__edited_pixels_pos\
-                        and (x,y) not in self.__information_pixels_pos:
-                            continue
-                    break
-
-                if len(self.__information_pixels_pos) < 9:
-                    self.__information_pixels_pos.append((x,y))
-
-                candidate_pixel = self.__px[x,y]
-                self.__edited_pixels_pos.add((x,y))
-
-                # In case of grayscale
-                if isinstance(candidate_pixel, int):
-                    candidate_pixel = (candidate_pixel,)
-
-                if self.__testmode:
-                    if current_bits[current_bits_pos] == '0':
-                        new_pixel = [255,0,0]
-                    else:
-                        new_pixel = [0,255,0]
-
-                    current_bits_pos += 1
-                else:
-                    new_pixel = []
-                    for color in candidate_pixel[:3]:
-                        color_bits = list(bin(color))[2:]
-                        color_bits[-1] = current_bits[current_bits_pos]
-
-                        color_bits = ''.join(color_bits)
-                        new_pixel.append(int(color_bits,2))
-
-                        current_bits_pos += 1
-
-                # If image has transparency
-                if len(candidate_pixel) > 3:
-                    new_pixel.extend(candidate_pixel[3:])
-
-                self.image.putpixel((x,y), tuple(new_pixel))
+        self.__update_image()
 
         return info_size
 
@@ -268,20 +439,20 @@ class LSB_WS:
             )
         self.__mode = 2
 
-        hidden_bytes = []
         info_size = self.__get_information_size() * 3
+        hidden_pixels = np.empty(info_size, dtype=np.intp)
+        # We report only progress by 5% because
+        # calling progress_callback can be slow
+        step = max(info_size // 20, 1)
 
-        for i in range(info_size):
-            hidden_bytes.append(self.__get_free_pixel_position())
+        for i in range(0, info_size, step):
+            count = min(step, info_size - i)
+            hidden_pixels[i:i+count] = self.__get_free_pixels_positions(count)
 
             if self._progress_callback:
-                percent = round((i+1) / info_size * 100)
-                # We report only progress by 5% because
-                # calling progress_callback can be slow
-                if percent and not percent % 5:
-                    self._progress_callback(i+1, info_size)
+                self._progress_callback(i+count, info_size)
 
-        return self.__coordinates_to_bytes(hidden_bytes)
+        return self.__positions_to_bytes(hidden_pixels)
 
     def save(self, fp, format: Optional[str] = None) -> None:
         """Sugar to the self.image.save method"""
@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 
-from os import getenv
-from pathlib import Path
+from os import getenv, fstat
+from mmap import mmap, ACCESS_READ
+from os.path import exists
+from stat import S_ISREG
+from shutil import copyfile, copyfileobj, SameFileError
 
-from traceback import format_exception
 from sys import stdout, version as sys_version
 try:
     import click
@@ -11,7 +13,9 @@ except ImportError:
     raise RuntimeError(
         'SteganoN was installed without CLI. Try to install steganon[cli]'
     )
-from steganon import LSB_WS, Image, pngify, VERSION
+# LSB_WS and Image are imported inside of commands that
+# use them, as PIL and NumPy are slow to import
+from steganon import VERSION
 from .tools import progress_callback
 
 
@@ -22,6 +26,9 @@ class StructuredGroup(click.Group):
     def __init__(self, name=None, commands=None, **kwargs):
         super().__init__(name, commands, **kwargs)
         self.commands = commands or {}
+        # Command name -> its styled name. Commands are added
+        # after __init__, so we fill it on the first format
+        self._styled_names = {}
 
     def list_commands(self, ctx):
         return self.commands
@@ -34,10 +41,11 @@ class StructuredGroup(click.Group):
             if v.hidden:
                 continue
 
-            if v.name == 'info':
-                command_name = click.style(v.name, fg='cyan', bold=True)
-            else:
-                command_name = click.style(v.name, fg='white', bold=True)
+            command_name = self._styled_names.get(v.name)
+            if command_name is None:
+                command_name = click.style(v.name, bold=True,
+                    fg='cyan' if v.name == 'info' else 'white')
+                self._styled_names[v.name] = command_name
 
             text = f'  o  {command_name} :: {v.get_short_help_str().strip()}'
             formatter.write_text(text)
@@ -94,16 +102,34 @@ def hide(data, seed, input, output, testmode):
         \b
         ?: Ignore --output option to write back to --input.
     """
-    if Path(data).exists():
-        data = open(data, 'rb').read()
+    from steganon import LSB_WS, Image
+
+    # exists() returns False instead of raising on too long
+    # or invalid paths, so --data can be a long text or hex.
+    # Pipes and devices (e.g /dev/stdin, <(...)) are files too
+    if exists(data):
+        # We map regular data file to memory instead of reading
+        # it, hide() takes any bytes-like object. Empty file can
+        # not be mapped, but hide() will reject it anyway. Pipes
+        # and devices have no size to map, so we read them
+        with open(data, 'rb') as data_file:
+            data_stat = fstat(data_file.fileno())
+
+            if not S_ISREG(data_stat.st_mode):
+                data = data_file.read()
+            elif data_stat.st_size:
+                data = mmap(data_file.fileno(), 0, access=ACCESS_READ)
+            else:
+                data = b''
     else:
         try:
             data = int(data, 16)
         except ValueError:
             data = data.encode()
 
-    if Path(seed).exists():
-        seed = open(seed, 'rb').read()
+    if exists(seed):
+        with open(seed, 'rb') as seed_file:
+            seed = seed_file.read()
     else:
         try:
             seed = int(seed, 16)
@@ -154,8 +180,11 @@ def extract(seed, input, output):
         steganon-cli extract --input image_hidden.png --seed "VerySecretSeed"\\
             --output secret.txt
     """
-    if Path(seed).exists():
-        seed = open(seed, 'rb').read()
+    from steganon import LSB_WS, Image
+
+    if exists(seed):
+        with open(seed, 'rb') as seed_file:
+            seed = seed_file.read()
     else:
         try:
             seed = int(seed, 16)
@@ -168,8 +197,14 @@ def extract(seed, input, output):
 
     click.echo()
 
-    out = open(output, 'wb') if output else stdout.buffer
-    out.write(secret_data)
+    # Data is extracted as a whole, so we write it by one
+    # call. Big writes bypass the buffer of file object
+    if output:
+        with open(output, 'wb') as out:
+            out.write(secret_data)
+    else:
+        stdout.buffer.write(secret_data)
+        stdout.buffer.flush()
 
 @cli.command(name='pngify')
 @click.option(
@@ -190,8 +225,27 @@ def _pngify(input, output):
     Example:\b
         steganon-cli pngify --input image.jpg --output image.png
     """
+    from steganon import Image
+
     output = stdout.buffer if output == 'STDOUT' else output
-    pngify(Image.open(input)).save(output, format='PNG')
+    image = Image.open(input)
+
+    # Image.open reads only a header, so if --input is
+    # already PNG we just copy it without re-encoding
+    if image.format == 'PNG':
+        image.close()
+        if output is stdout.buffer:
+            with open(input, 'rb') as input_file:
+                copyfileobj(input_file, output)
+        else:
+            try:
+                copyfile(input, output)
+            except SameFileError:
+                pass # --output is --input, nothing to do
+    else:
+        # We don't need a decoded PNG back as tools.pngify
+        # does, so image is encoded to the --output once
+        image.save(output, format='PNG')
 
 @cli.command()
 def info():
@@ -232,6 +286,7 @@ def safe_steganon_cli_startup():
         if isinstance(e, click.Abort):
             click.echo(); exit(0)
 
+        from traceback import format_exception
         traceback = ''.join(format_exception(
             e,
             value = e,
@@ -2,7 +2,8 @@
 
 from click import echo, style
 
+# Styled once, we only put a percent in it on every call
+_PROGRESS_TEXT = style(text='@ Working on data... {}%\r', fg='white', bold=True)
+
 def progress_callback(current: int, total: int):
-    text = style(text=f'@ Working on data... {int(current/total*100)}%\r',
-                 fg='white', bold=True)
-    echo(text, nl=False)
+    echo(_PROGRESS_TEXT.format(int(current/total*100)), nl=False)